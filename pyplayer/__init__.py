@@ -1,4 +1,7 @@
+import multiprocessing
+
 from pyplayer.cli import main as cli_main
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # frozen executable spawns pre-render workers
     cli_main()
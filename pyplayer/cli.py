@@ -7,7 +7,7 @@ from typing import Any, Callable, override
 from functools import wraps
 from .player import Player
 from .exceptions import PyPlayerError
-from .renderer_factory import RendererFactory, RGBPixel
+from .renderer_factory import BaseRenderer, RendererFactory, RGBPixel
 
 TypeFunc = Callable[[str], Any]
 
@@ -235,6 +235,13 @@ class RenderingArgumentGroup(BaseArgumentGroup):
             + "This makes dark areas of the video appear solid instead of transparent.\n"
             + "(Default: enabled)",
         )
+        rendering_group.add_argument(
+            "--high-quality",
+            "-hq",
+            action="store_true",
+            help="Always resize frames with the LANCZOS filter.\n"
+            + "By default a faster filter is picked based on the scale factor.",
+        )
 
 
 class VideoArgumentGroup(BaseArgumentGroup):
@@ -247,6 +254,27 @@ class VideoArgumentGroup(BaseArgumentGroup):
             action="store_true",
             help="Enable color rendering (if supported by terminal/style).",
         )
+        color_group.add_argument(
+            "--color-palette",
+            "-cp",
+            choices=list(BaseRenderer.color_palettes),
+            default="truecolor",
+            help="Color palette used for color rendering:\n"
+            + "- truecolor: 24-bit colors.\n"
+            + "- 256: xterm 256-color palette, much less output per frame.\n"
+            + "(Default: truecolor)",
+        )
+        color_group.add_argument(
+            "--quantize-bits",
+            "-qb",
+            type=int,
+            choices=range(8),
+            default=0,
+            metavar="0-7",
+            help="Reduce every truecolor channel to buckets of 2^N values.\n"
+            + "Similar colors then share escape codes, shrinking the output.\n"
+            + "(Default: 0, exact colors)",
+        )
         color_group.add_argument(
             "--grayscale",
             "-g",
@@ -300,6 +328,13 @@ class PerformanceArgumentGroup(BaseArgumentGroup):
             action="store_true",
             help="Disable frame skipping entirely (may cause sync issues on slow systems).",
         )
+        perf_group.add_argument(
+            "--no-hwaccel",
+            "-nhw",
+            action="store_true",
+            help="Disable hardware accelerated video decoding.\n"
+            + "Try this if decoding fails or looks wrong on your GPU driver.",
+        )
         perf_group.add_argument(
             "--pre-render",
             "-pr",
@@ -313,7 +348,7 @@ class PerformanceArgumentGroup(BaseArgumentGroup):
             type=int,
             default=multiprocessing.cpu_count(),
             metavar="N",
-            help="Number of threads used for parallel frame processing.\n"
+            help="Number of worker threads and processes used for pre-rendering.\n"
             + f"(Default: system CPU count = {multiprocessing.cpu_count()})",
         )
 
@@ -348,6 +383,10 @@ def main() -> None:
             diff_mode=args.diff_mode,
             output_resolution=args.output_resolution,
             transparent=args.transparent,
+            high_quality=args.high_quality,
+            color_palette=args.color_palette,
+            quantize_bits=args.quantize_bits,
+            hwaccel=not args.no_hwaccel,
         ).play()
 
     except PyPlayerError as e:
@@ -73,6 +73,22 @@ class InvalidRenderStyleError(RenderingError):
         self.style = style
 
 
+class InvalidColorPaletteError(RenderingError):
+    """Raised when an unsupported color palette is specified."""
+
+    def __init__(self, palette: str) -> None:
+        super().__init__(f"Invalid color palette: {palette}")
+        self.palette = palette
+
+
+class InvalidQuantizeBitsError(RenderingError):
+    """Raised when the number of quantized bits is outside of 0-7."""
+
+    def __init__(self, quantize_bits: int) -> None:
+        super().__init__(f"Invalid quantize bits: {quantize_bits}, expected 0-7")
+        self.quantize_bits = quantize_bits
+
+
 class FrameRenderingError(RenderingError):
     """Raised when there's an error rendering a specific frame."""
 
@@ -9,19 +9,24 @@ import traceback
 import statistics
 import re
 import numpy as np
+import numpy.typing as npt
+from collections.abc import Generator
 from typing import Callable
-from .video_processor import VideoProcessor
+from .video_processor import VideoProcessor, prefetch_frames
 from .renderer_factory import RendererManager
 from .renderer_factory import RGBPixel
 from .exceptions import (
     PyPlayerError,
-    FrameNotFoundError,
     FrameRenderingError,
     AudioPlaybackError,
     VideoProcessingError,
 )
 
 
+# frames decoded ahead during playback, a native 1080p frame is ~6MB
+PREFETCH_FRAMES = 8
+
+
 class Player:
     def __init__(
         self,
@@ -42,14 +47,21 @@ class Player:
         diff_mode: str = "none",
         output_resolution: tuple[int, int] | None = (640, 480),
         transparent: bool = False,
+        high_quality: bool = False,
+        color_palette: str = "truecolor",
+        quantize_bits: int = 0,
+        hwaccel: bool = True,
     ) -> None:
-        self.processor = VideoProcessor(video_path)
-        self.frames_dir, self.audio_path, detected_fps = self.processor.process_video(
-            grayscale=grayscale,
-            color_smoothing=color_smoothing,
-            color_smoothing_params=color_smoothing_params,
-            output_resolution=output_resolution,
+        self.processor = VideoProcessor(video_path, hwaccel=hwaccel)
+        # pre-rendering writes the audio in the same pass as the frames
+        self.audio_path, detected_fps = self.processor.process_video(
+            extract_audio=not pre_render
         )
+        self.grayscale = grayscale
+        self.color_smoothing = color_smoothing
+        self.color_smoothing_params = color_smoothing_params
+        self.output_resolution = output_resolution
+        self._frame_stream: Generator[npt.NDArray[np.uint8]] | None = None
 
         if fps is not None:
             self.fps = fps
@@ -73,18 +85,28 @@ class Player:
             color=color,
             frame_color=frame_color,
             transparent=transparent,
+            high_quality=high_quality,
+            color_palette=color_palette,
+            quantize_bits=quantize_bits,
         )
 
-        self.pre_rendered_frames = {}
+        self.pre_rendered_frames: list[str] = []
         if self.pre_render:
-            frame_files = sorted(
-                os.path.join(self.frames_dir, f)
-                for f in os.listdir(self.frames_dir)
-                if f.endswith(".png")
-            )
             term_size = os.get_terminal_size()
-            self.pre_rendered_frames = self.renderer.pre_render_frames(
-                frame_files, term_size.columns, term_size.lines, self.num_threads
+            # ffmpeg scales straight to the size the renderer works with, so the
+            # pipe only carries those pixels and the renderer skips its resize
+            frames = self.processor.iter_frames(
+                grayscale=grayscale,
+                color_smoothing=color_smoothing,
+                color_smoothing_params=color_smoothing_params,
+                output_resolution=self.renderer.renderer.get_render_size(
+                    term_size.columns, term_size.lines
+                ),
+                extract_audio=True,
+                reuse_buffer=True,  # each frame is copied into the batch right away
+            )
+            self.pre_rendered_frames = self.renderer.pre_render_stream(
+                frames, term_size.columns, term_size.lines, self.num_threads
             )
 
     def play(self) -> None:
@@ -115,6 +137,8 @@ class Player:
         finally:
             pygame.mixer.quit()
             self.renderer.show_cursor()
+            if self._frame_stream is not None:
+                self._frame_stream.close()  # stops ffmpeg if playback ended early
             self.processor.cleanup()
 
     def _render_frame_diff(self, current_frame: str) -> None:
@@ -187,19 +211,34 @@ class Player:
         throughput_rates: list[float] = []
         diff_render_times: list[float] = []  # Track diff render times
 
-        frame_files = sorted(
-            os.path.join(self.frames_dir, f)
-            for f in os.listdir(self.frames_dir)
-            if f.endswith(".png")
-        )
-        total_frames = len(frame_files)
+        # the frame count of a stream is only known once it ends
+        total_frames: int | None = None
+        if self.pre_render:
+            total_frames = len(self.pre_rendered_frames)
+        else:
+            # decoding runs ahead of playback instead of waiting for each read
+            self._frame_stream = prefetch_frames(
+                self.processor.iter_frames(
+                    grayscale=self.grayscale,
+                    color_smoothing=self.color_smoothing,
+                    color_smoothing_params=self.color_smoothing_params,
+                    output_resolution=self.output_resolution,
+                ),
+                PREFETCH_FRAMES,
+            )
 
-        while current_frame < total_frames:
+        while total_frames is None or current_frame < total_frames:
             current_time = time.perf_counter()
             time_difference = current_time - next_frame_time
 
             if time_difference >= 0:
                 if time_difference > self.skip_threshold and self.frame_skip:
+                    # a skipped frame still has to be read from the stream
+                    if (
+                        self._frame_stream is not None
+                        and next(self._frame_stream, None) is None
+                    ):
+                        break
                     skipped_frames += 1
                     next_frame_time = start_time + (current_frame + 1) * frame_duration
                     current_frame += 1
@@ -207,35 +246,44 @@ class Player:
 
                 term_size = os.get_terminal_size()
 
-                frame_path = frame_files[current_frame]
-                if not os.path.exists(frame_path):
-                    raise FrameNotFoundError(current_frame, frame_path)
-
                 frame_start = time.perf_counter()
-                try:
-                    # Use pre-rendered frame if available, otherwise render on-the-fly
-                    if self.pre_render and frame_path in self.pre_rendered_frames:
-                        ascii_frame = self.pre_rendered_frames[frame_path]
-                    else:
+                img_size: int | None = None
+                if self.pre_render:
+                    # a frame that failed to pre-render keeps the previous one shown
+                    ascii_frame = (
+                        self.pre_rendered_frames[current_frame]
+                        or self.previous_frame
+                        or ""
+                    )
+                else:
+                    frame = (
+                        next(self._frame_stream, None)
+                        if self._frame_stream is not None
+                        else None
+                    )
+                    if frame is None:
+                        break
+
+                    try:
                         ascii_frame = self.renderer.convert_frame(
-                            frame_path,
+                            frame,
                             term_size.columns,
                             term_size.lines,
                         )
-                except FrameRenderingError as e:
-                    raise e
-                except Exception as e:
-                    raise FrameRenderingError(frame_path, str(e))
+                    except FrameRenderingError as e:
+                        raise e
+                    except Exception as e:
+                        raise FrameRenderingError(f"frame {current_frame + 1}", str(e))
+
+                    img_size = frame.nbytes
 
                 frame_process_time = time.perf_counter() - frame_start
 
-                img_size = os.path.getsize(frame_path)
                 ascii_size = len(ascii_frame.encode("utf-8"))
 
                 # Calculate memory usage of pre-rendered frames
                 pre_rendered_memory = sum(
-                    len(frame.encode("utf-8"))
-                    for frame in self.pre_rendered_frames.values()
+                    len(frame.encode("utf-8")) for frame in self.pre_rendered_frames
                 )
 
                 throughput = (
@@ -266,8 +314,8 @@ class Player:
                 # Store current frame for next comparison
                 self.previous_frame = ascii_frame
 
-                if self.pre_render and frame_path in self.pre_rendered_frames:
-                    del self.pre_rendered_frames[frame_path]
+                if self.pre_render:
+                    self.pre_rendered_frames[current_frame] = ""
 
                 if self.debug:
                     window_size = min(10, current_frame)
@@ -284,10 +332,12 @@ class Player:
                     memory_usage = pre_rendered_memory / (1024 * 1024)  # convert to MB
 
                     debug_sections = [
-                        f"Frame: {current_frame + 1}/{total_frames}{' [pre]' if self.pre_render else '[on-the-fly]'}",
+                        f"Frame: {current_frame + 1}/{total_frames or '?'}{' [pre]' if self.pre_render else '[on-the-fly]'}",
                         f"FPS: {self.fps:.1f} (real: {real_fps:.1f})",
                         f"{f'Mem: {memory_usage:.2f}MB' if self.pre_render else f'Proc: {frame_process_time * 1000:.1f}ms'}",
-                        f"Size: {img_size / 1024:.1f}KB→{ascii_size / 1024:.1f}KB",
+                        f"Size: {img_size / 1024:.1f}KB→{ascii_size / 1024:.1f}KB"
+                        if img_size is not None
+                        else f"Size: {ascii_size / 1024:.1f}KB",
                     ]
 
                     # only add throughput for non-pre-rendered frames
@@ -338,6 +388,9 @@ class Player:
             else:
                 time.sleep(-time_difference)
 
+        if total_frames is None:
+            total_frames = current_frame
+
         while pygame.mixer.music.get_busy():
             time.sleep(0.1)
 
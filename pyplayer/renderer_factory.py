@@ -1,13 +1,30 @@
 # pyright: reportUnknownArgumentType=false,reportUnknownMemberType=false
 from functools import lru_cache
+from itertools import chain, islice
+import hashlib
+import re
 import sys
 from abc import ABC, abstractmethod
-from collections.abc import Sequence
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import (
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+import numpy as np
+import numpy.typing as npt
 from PIL import Image
 from tqdm import tqdm
-from typing import override
-from .exceptions import InvalidRenderStyleError, FrameRenderingError
+from typing import Any, override
+from .exceptions import (
+    InvalidRenderStyleError,
+    InvalidColorPaletteError,
+    InvalidQuantizeBitsError,
+    FrameRenderingError,
+    ThreadingError,
+)
 
 type RGBPixel = tuple[int, int, int]
 type GrayscalePixel = int
@@ -15,12 +32,127 @@ type RGBPixelSequence = Sequence[RGBPixel]
 type GrayscalePixelSequence = Sequence[GrayscalePixel]
 type ColorTextSegment = tuple[str | None, str]
 
+_ANSI_ESCAPE_PATTERN = re.compile(rb"\033\[[0-9;]*m")
+
+
+@lru_cache(maxsize=4096)
+def _packed_rgb_to_ansi(packed: int) -> str:
+    # a single int key keeps the cache entries small and the lookups cheap
+    return f"\033[38;2;{packed >> 16};{(packed >> 8) & 0xFF};{packed & 0xFF}m"
+
+
+def _pack_rgb(rgb: npt.NDArray[np.integer]) -> npt.NDArray[np.uint32]:
+    """Pack an (..., 3) RGB array into r << 16 | g << 8 | b ints."""
+    rgb = rgb.astype(np.uint32)
+    packed = (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+    return packed.astype(np.uint32, copy=False)  # shifts are typed as signed
+
+
+# pixels sampled at most for the Otsu histogram, beyond that it's strided
+_OTSU_MAX_SAMPLES = 1 << 18
+# pixels sampled for the fingerprint that the last Otsu threshold is cached on
+_OTSU_FINGERPRINT_SAMPLES = 1 << 12
+
+# channel levels of the xterm 6x6x6 color cube (palette entries 16-231)
+_CUBE_LEVELS = np.array([0, 95, 135, 175, 215, 255])
+
+
+@lru_cache(maxsize=256)
+def _palette_to_ansi(index: int) -> str:
+    return f"\033[38;5;{index}m"
+
+
+def _palette_lut() -> npt.NDArray[np.uint32]:
+    """Get the nearest xterm-256 palette index for every 15-bit RGB color.
+
+    Covers the color cube and the gray ramp (232-255), the 16 system colors are
+    left out as terminals theme them. 32768 entries, built once at import.
+    """
+    # every 5-bit bucket is matched by its center
+    levels = (np.arange(32, dtype=np.int32) << 3) | 4
+    red, green, blue = np.indices((32, 32, 32)).reshape(3, -1)
+
+    # the cube is the product of its channel levels, so its nearest entry is the
+    # nearest level of every channel on its own
+    level_distances = (levels[:, None] - _CUBE_LEVELS[None, :]) ** 2
+    nearest = level_distances.argmin(axis=1)
+    distance = level_distances.min(axis=1)
+    cube_index = 16 + 36 * nearest[red] + 6 * nearest[green] + nearest[blue]
+    cube_distance = distance[red] + distance[green] + distance[blue]
+
+    gray_distances = (levels[:, None] - np.arange(8, 248, 10)[None, :]) ** 2
+    gray_distances = gray_distances[red] + gray_distances[green] + gray_distances[blue]
+    gray_index = 232 + gray_distances.argmin(axis=1)
+
+    # a tie goes to the cube, it comes first in the palette
+    closer_gray = gray_distances.min(axis=1) < cube_distance
+    return np.where(closer_gray, gray_index, cube_index).astype(np.uint32)
+
+
+_PALETTE_LUT = _palette_lut()
+
+
+def _packed_rgb_to_palette(
+    packed_colors: npt.NDArray[np.uint32],
+) -> npt.NDArray[np.uint32]:
+    """Map packed r << 16 | g << 8 | b colors to their 256-color palette index."""
+    # 5 bits per channel: (r >> 3) << 10 | (g >> 3) << 5 | b >> 3
+    index = (
+        ((packed_colors >> 9) & 0x7C00)
+        | ((packed_colors >> 6) & 0x3E0)
+        | ((packed_colors >> 3) & 0x1F)
+    )
+    return _PALETTE_LUT[index]
+
+
+def _splice_escape_codes(
+    codepoints: npt.NDArray[np.uint32],
+    positions: npt.NDArray[np.intp],
+    codes: list[str],
+) -> str:
+    """Insert escape codes into a frame of UCS-4 code points and decode it.
+
+    Each code is inserted whole before its position, codes sharing a position keep
+    their order. The frame is decoded once instead of joining a string per code.
+    """
+    escape_points = np.frombuffer("".join(codes).encode("utf-32-le"), np.uint32)
+    code_lengths = np.fromiter(map(len, codes), dtype=np.intp, count=len(codes))
+    frame = np.insert(codepoints, np.repeat(positions, code_lengths), escape_points)
+    return frame.tobytes().decode("utf-32-le")
+
 
 class ColorManager:
     @staticmethod
-    @lru_cache(maxsize=None)
     def rgb_to_ansi(r: int, g: int, b: int) -> str:
-        return f"\033[38;2;{r};{g};{b}m"
+        return _packed_rgb_to_ansi((r << 16) | (g << 8) | b)
+
+    @staticmethod
+    def rgb_to_ansi_batch(packed_colors: npt.NDArray[np.uint32]) -> list[str]:
+        """Get the ANSI color codes for an array of packed colors.
+
+        Each distinct color is only formatted (or looked up) once.
+
+        Args:
+            packed_colors: Colors packed as (r << 16) | (g << 8) | b
+
+        Returns:
+            The ANSI color codes, in the same order as the flattened input
+        """
+        unique_colors, inverse = np.unique(packed_colors, return_inverse=True)
+        codes = [_packed_rgb_to_ansi(int(color)) for color in unique_colors]
+        return [codes[index] for index in inverse.ravel()]
+
+    @staticmethod
+    def palette_to_ansi_batch(palette_indices: npt.NDArray[np.uint32]) -> list[str]:
+        """Get the 256-color ANSI codes for an array of palette indices.
+
+        Args:
+            palette_indices: Indices into the 256-color palette
+
+        Returns:
+            The ANSI color codes, in the same order as the flattened input
+        """
+        return [_palette_to_ansi(index) for index in palette_indices.ravel().tolist()]
 
     @staticmethod
     def reset_color() -> str:
@@ -28,13 +160,23 @@ class ColorManager:
 
     @staticmethod
     def calculate_average_color(
-        colors: RGBPixelSequence,
+        colors: RGBPixelSequence | npt.NDArray[np.uint8],
     ) -> RGBPixel:
-        if not colors:
+        """Get the average of a set of RGB colors, rounded down.
+
+        The built-in renderers average whole frames of cells at once, this is
+        kept for single sets of colors.
+
+        Args:
+            colors: A sequence of RGB tuples or an (N, 3) array
+
+        Returns:
+            The average color, (0, 0, 0) if there are no colors
+        """
+        pixels = np.asarray(colors, dtype=np.uint32).reshape(-1, 3)
+        if not len(pixels):
             return (0, 0, 0)
-        avg_r = sum(c[0] for c in colors) // len(colors)
-        avg_g = sum(c[1] for c in colors) // len(colors)
-        avg_b = sum(c[2] for c in colors) // len(colors)
+        avg_r, avg_g, avg_b = (pixels.sum(axis=0) // len(pixels)).tolist()
         return (avg_r, avg_g, avg_b)
 
     @staticmethod
@@ -42,7 +184,9 @@ class ColorManager:
         """Compress a frame by optimizing ANSI color codes.
 
         This method reduces the amount of ANSI escape sequences by combining
-        consecutive characters with the same color code.
+        consecutive characters with the same color code. Escape codes are found
+        with a single precompiled regex over the UTF-8 encoded frame and the
+        output is written into one bytearray, decoded once at the end.
 
         Args:
             text: The text to compress
@@ -53,84 +197,63 @@ class ColorManager:
         if not text:
             return text
 
-        lines = text.split("\n")
-        compressed_lines: list[str] = []
+        reset_code = ColorManager.reset_color().encode("ascii")
+        compressed = bytearray()
 
-        for line in lines:
-            if not line or "\033[" not in line:
-                compressed_lines.append(line)
+        for line_number, line in enumerate(text.encode("utf-8").split(b"\n")):
+            if line_number:
+                compressed += b"\n"
+            if b"\033[" not in line:
+                compressed += line
                 continue
 
-            tokens: list[tuple[str, str]] = []
-            i: int = 0
-            while i < len(line):
-                if line.startswith("\033[", i):
-                    end: int = line.find("m", i)
-                    if end != -1:
-                        tokens.append(
-                            ("ansi", line[i : end + 1])
-                        )  # capture ANSI escape
-                        i = end + 1
-                    else:
-                        tokens.append(("text", line[i]))  # capture non-ANSI text
-                        i += 1
-                else:
-                    tokens.append(("text", line[i]))  # capture non-ANSI text
-                    i += 1
-
-            optimized: list[tuple[str | None, str]] = []
-            current_color: str | None = None
-            current_text = ""
-            reset_code = "\033[0m"
-
-            for token_type, token_value in tokens:
-                if token_type == "ansi":
-                    if token_value.startswith(
-                        "\033[38;2;"
-                    ):  # checks for true color escape
-                        if current_color != token_value and current_text:
-                            optimized.append(
-                                (current_color, current_text)
-                            )  # append accumulated text with color
-                            current_text = ""
-                        current_color = token_value
-                    elif token_value == reset_code:  # reset to default color
-                        if current_text:
-                            optimized.append((current_color, current_text))
-                            current_text = ""
-                        optimized.append((reset_code, ""))  # append reset code
-                        current_color = None
-                    else:
-                        if current_text:
-                            optimized.append((current_color, current_text))
-                            current_text = ""
-                        optimized.append(
-                            (token_value, "")
-                        )  # append other ANSI codes as-is
+            line_start = len(compressed)
+            pending_text = bytearray()  # text waiting to be emitted in current_color
+            current_color: bytes | None = None
+            has_color = False
+            last_end = 0
+
+            for match in _ANSI_ESCAPE_PATTERN.finditer(line):
+                start, end = match.span()
+                if start > last_end:
+                    pending_text += line[last_end:start]
+                last_end = end
+                code = match.group()
+
+                if code.startswith(b"\033[38;2;"):  # true color escape
+                    if code != current_color and pending_text:
+                        if current_color is not None:
+                            compressed += current_color
+                            has_color = True
+                        compressed += pending_text
+                        pending_text.clear()
+                    current_color = code
+                    continue
+
+                # reset or any other code, flush the accumulated text first
+                if pending_text:
+                    if current_color is not None:
+                        compressed += current_color
+                        has_color = True
+                    compressed += pending_text
+                    pending_text.clear()
+                compressed += code
+                if code == reset_code:
+                    current_color = None
                 else:
-                    current_text += token_value  # add non-ANSI text
-
-            if current_text:
-                optimized.append((current_color, current_text))  # add remaining text
+                    has_color = True
 
-            compressed_line = ""
-            for color, segment_text in optimized:
-                if color is None:
-                    compressed_line += segment_text
-                elif color == reset_code:
-                    compressed_line += reset_code  # add reset sequence
-                else:
-                    compressed_line += color + segment_text  # add color with text
+            pending_text += line[last_end:]
+            if pending_text:
+                if current_color is not None:
+                    compressed += current_color
+                    has_color = True
+                compressed += pending_text
 
-            if any(color is not None and color != reset_code for color, _ in optimized):
-                if not compressed_line.endswith(reset_code):
-                    compressed_line += (
-                        reset_code  # ensure reset at the end of colored text
-                    )
+            if has_color and not compressed.endswith(reset_code, line_start):
+                compressed += reset_code  # ensure reset at the end of colored text
 
-            compressed_lines.append(compressed_line)
-
-        return "\n".join(compressed_lines)
+        return compressed.decode("utf-8")
 
 
 class BaseRenderer(ABC):
@@ -139,17 +262,37 @@ class BaseRenderer(ABC):
     All custom renderers should inherit from this class and implement the render method.
     """
 
+    color_palettes = ("truecolor", "256")
+
     def __init__(
         self,
         style: str,
         color: bool = False,
         frame_color: RGBPixel | None = None,
         transparent: bool = True,
+        high_quality: bool = False,
+        color_palette: str = "truecolor",
+        quantize_bits: int = 0,
     ):
+        if color_palette not in self.color_palettes:
+            raise InvalidColorPaletteError(color_palette)
+        if not 0 <= quantize_bits <= 7:
+            raise InvalidQuantizeBitsError(quantize_bits)
+
         self.style = style
         self.color = color
         self.frame_color = frame_color
         self.transparent = transparent
+        self.high_quality = high_quality
+        self.color_palette = color_palette
+        self.quantize_bits = quantize_bits
+        # clears the low bits of every channel of a packed color at once, the half
+        # step then moves each channel to the middle of its bucket instead of its
+        # darkest value
+        self._quantize_mask = np.uint32(((0xFF << quantize_bits) & 0xFF) * 0x010101)
+        self._quantize_half = np.uint32(((1 << quantize_bits) >> 1) * 0x010101)
+        # fingerprint and threshold of the last Otsu call, static scenes repeat it
+        self._otsu_cache: tuple[int, int] | None = None
 
     @abstractmethod
     def render(self, img: Image.Image, width: int, height: int) -> str:
@@ -165,6 +308,73 @@ class BaseRenderer(ABC):
         """
         pass
 
+    def get_render_size(self, width: int, height: int) -> tuple[int, int]:
+        """Get the pixel size an image is resized to before rendering.
+
+        Args:
+            width: The target width in characters
+            height: The target height in characters
+
+        Returns:
+            The (width, height) in pixels the renderer works with
+        """
+        return (width, height)
+
+    def resize(self, img: Image.Image, width: int, height: int) -> Image.Image:
+        """Resize an image to the pixel size used for the given character size.
+
+        Images that already have the right size are returned as-is. Unless
+        high_quality is set, a cheap filter is picked based on the scale factor,
+        at terminal sizes the difference to LANCZOS is hardly visible.
+
+        Large downscales are first reduced by an integer factor with a box filter
+        (reducing_gap), so the slower filters only run on a few times the target
+        size.
+        """
+        size = self.get_render_size(width, height)
+        if img.size == size:
+            return img
+
+        if self.high_quality:
+            resample = Image.Resampling.LANCZOS
+        elif img.width / size[0] > 4:  # heavy downscale
+            return img.resize(size, Image.Resampling.BOX)
+        else:
+            resample = Image.Resampling.BILINEAR
+        # 3.0 is indistinguishable from a full resample of the original
+        return img.resize(size, resample, reducing_gap=3.0)
+
+    def quantize_colors(
+        self, packed_colors: npt.NDArray[np.uint32]
+    ) -> npt.NDArray[np.uint32]:
+        """Map packed r << 16 | g << 8 | b colors to the values of the color palette.
+
+        Truecolor snaps every channel to the center of its 2 ** quantize_bits wide
+        bucket, the 256-color palette maps the colors to palette indices. Either way
+        neighbouring similar colors can share a code.
+        """
+        if self.color_palette == "256":
+            return _packed_rgb_to_palette(packed_colors)
+        if self.quantize_bits:
+            quantized = (packed_colors & self._quantize_mask) | self._quantize_half
+            return quantized.astype(np.uint32, copy=False)
+        return packed_colors
+
+    def color_codes(self, colors: npt.NDArray[np.uint32]) -> list[str]:
+        """Get the ANSI color codes for colors returned by quantize_colors."""
+        if self.color_palette == "256":
+            return ColorManager.palette_to_ansi_batch(colors)
+        return ColorManager.rgb_to_ansi_batch(colors)
+
+    @staticmethod
+    def ensure_mode(img: Image.Image, mode: str) -> Image.Image:
+        """Convert an image to the given mode.
+
+        Unlike Image.convert, an image that already has the mode is returned
+        as-is instead of being copied.
+        """
+        return img if img.mode == mode else img.convert(mode)
+
     def apply_frame_color(
         self, text: str
     ) -> str:  # might find a better way to do this, idk yet
@@ -183,41 +393,52 @@ class BaseRenderer(ABC):
         the between-class variance (or minimizes within-class variance)
         between foreground and background pixels.
 
+        Frames with more than _OTSU_MAX_SAMPLES pixels only histogram an evenly
+        strided subset of them, the threshold is approximate then. That's fine as
+        the callers scale it by a factor anyway. The threshold of the last frame is
+        kept along with a fingerprint of about _OTSU_FINGERPRINT_SAMPLES strided
+        pixels, a frame with the same fingerprint skips the histogram and the search.
+
         Args:
             gray_img: A grayscale PIL Image
 
         Returns:
             The optimal threshold value (0-255)
         """
-        hist = [0] * 256
-        pixels: GrayscalePixelSequence = list(gray_img.getdata())
-        for pixel in pixels:
-            hist[pixel] += 1
-
-        total = sum(hist)
-        sum_total = sum(i * hist[i] for i in range(256))
-        max_variance = 0.0
-        threshold = 128
-
-        sum_b = 0
-        w_b = 0
-        for i in range(256):
-            w_b += hist[i]
-            if w_b == 0:
-                continue
-            w_f = total - w_b
-            if w_f == 0:
-                break
+        pixels = np.asarray(gray_img, dtype=np.uint8).ravel()
+        fingerprint_stride = max(1, pixels.size // _OTSU_FINGERPRINT_SAMPLES)
+        key = hash((pixels.size, pixels[::fingerprint_stride].tobytes()))
+        if self._otsu_cache is not None and self._otsu_cache[0] == key:
+            return self._otsu_cache[1]
+
+        if pixels.size > _OTSU_MAX_SAMPLES:
+            stride = -(-pixels.size // _OTSU_MAX_SAMPLES)  # ceil division
+            counts = np.bincount(pixels[::stride], minlength=256)
+        else:
+            counts = np.asarray(gray_img.histogram(), dtype=np.int64)
+
+        threshold = self._otsu_search(counts.astype(np.float64))
+        self._otsu_cache = (key, threshold)
+        return threshold
 
-            sum_b += i * hist[i]
+    @staticmethod
+    def _otsu_search(hist: npt.NDArray[np.float64]) -> int:
+        """Find the Otsu threshold of a 256-bin histogram."""
+        levels = np.arange(256, dtype=np.float64)
+
+        # class weights and means for every candidate threshold at once
+        w_b = np.cumsum(hist)
+        w_f = w_b[-1] - w_b
+        sum_b = np.cumsum(levels * hist)
+        with np.errstate(divide="ignore", invalid="ignore"):
             m_b = sum_b / w_b
-            m_f = (sum_total - sum_b) / w_f
+            m_f = (sum_b[-1] - sum_b) / w_f
             variance = w_b * w_f * (m_b - m_f) ** 2
+        variance[(w_b == 0) | (w_f == 0)] = 0.0
 
-            if variance > max_variance:
-                max_variance = variance
-                threshold = i
-
+        threshold = int(np.argmax(variance))  # first maximum, like a strict > scan
+        if variance[threshold] <= 0.0:
+            return 128
         return threshold
 
 
@@ -238,79 +459,152 @@ class TextRenderer(BaseRenderer):
         color: bool = False,
         frame_color: RGBPixel | None = None,
         transparent: bool = False,
+        high_quality: bool = False,
+        color_palette: str = "truecolor",
+        quantize_bits: int = 0,
     ):
         super().__init__(
-            style=style, color=color, frame_color=frame_color, transparent=transparent
+            style=style,
+            color=color,
+            frame_color=frame_color,
+            transparent=transparent,
+            high_quality=high_quality,
+            color_palette=color_palette,
+            quantize_bits=quantize_bits,
         )
         self.ascii_chars = self.styles[style]
+        # the flags are fixed for the renderer's lifetime, pick the path only once
+        self._render_pixels = self._render_color if color else self._render_grayscale
 
-    @override
-    def render(self, img: Image.Image, width: int, height: int) -> str:
-        img = img.resize((width, height), Image.Resampling.LANCZOS)
+        # brightness -> character lookups, so no frame ever divides per pixel
         intensity_range = 255 / (len(self.ascii_chars) - 1)
-        result = (
-            self._render_color(img, intensity_range)
-            if self.color
-            else self._render_grayscale(img, intensity_range)
+        self._index_lut = bytes(
+            int(brightness / intensity_range) for brightness in range(256)
         )
-        return ColorManager.compress_frame(result)
-
-    def _render_color(self, img: Image.Image, intensity_range: float) -> str:
-        img = img.convert("RGB")
-        ascii_image: list[str] = []
+        self._char_lut = "".join(self.ascii_chars[i] for i in self._index_lut)
+        # ASCII styles translate the luma bytes straight into glyph bytes
+        self._byte_lut = (
+            self._char_lut.encode("ascii") if self._char_lut.isascii() else None
+        )
+        # block styles aren't ASCII, they are gathered as UCS-4 code points instead
+        self._codepoint_lut = np.frombuffer(
+            self._char_lut.encode("utf-32-le"), dtype=np.uint32
+        )
+        # character index -> code point for the color path, blanks (0xFF) are spaces
+        self._index_codepoints = np.full(256, ord(" "), dtype=np.uint32)
+        self._index_codepoints[: len(self.ascii_chars)] = [
+            ord(char) for char in self.ascii_chars
+        ]
 
-        threshold = 0
+    @override
+    def render(self, img: Image.Image, width: int, height: int) -> str:
+        if not self.color:
+            # only the luma is used, resizing it touches one channel instead of three
+            img = self.ensure_mode(img, "L")
+        img = self.resize(img, width, height)
+        # both paths already emit minimal escape codes, no compress_frame pass needed
+        return self._render_pixels(img)
+
+    def _render_color(self, img: Image.Image) -> str:
+        img = self.ensure_mode(img, "RGB")
+        gray_img = img.convert("L")  # ITU-R 601-2 luma, computed by PIL in C
+
+        # 0xFF marks pixels that are left blank
+        index_lut = self._index_lut
         if self.transparent:
-            gray_img = img.convert("L")
             threshold = self.calculate_otsu_threshold(gray_img)
             threshold = max(10, int(threshold * 0.4))
+            index_lut = b"\xff" * threshold + index_lut[threshold:]
+        char_indices = np.frombuffer(
+            gray_img.tobytes().translate(index_lut), dtype=np.uint8
+        )
 
-        pixels: RGBPixelSequence = list(img.getdata())
-        for pixel in pixels:
-            r, g, b = pixel
-            brightness = (r + g + b) / 3
+        # colors packed as r << 16 | g << 8 | b straight from the raw pixel buffer,
+        # avoids building a tuple per pixel
+        rgb = np.frombuffer(img.tobytes(), dtype=np.uint8).reshape(-1, 3)
+        packed_colors = _pack_rgb(rgb)
 
-            if self.transparent and brightness < threshold:
-                ascii_image.append(" ")
-            elif r == g == b == 0:
-                ascii_image.append(" ")
-            else:
-                color_code = ColorManager.rgb_to_ansi(r, g, b)
-                ascii_char = self.ascii_chars[int(brightness / intensity_range)]
-                ascii_image.append(color_code + ascii_char)
+        blank = (char_indices == 0xFF) | (packed_colors == 0)
+        codepoints = np.where(blank, ord(" "), self._index_codepoints[char_indices])
 
-        ascii_image.append(ColorManager.reset_color())
-        return "".join(ascii_image)
+        # a code is only emitted where a lit pixel changes color, blanks keep the
+        # current color, so python only ever loops over the color runs
+        lit = np.flatnonzero(~blank)
+        lit_colors = self.quantize_colors(packed_colors[lit])
+        run_starts = np.ones(lit.size, dtype=np.bool_)
+        run_starts[1:] = lit_colors[1:] != lit_colors[:-1]
+        codes = self.color_codes(lit_colors[run_starts])
 
-    def _render_grayscale(self, img: Image.Image, intensity_range: float) -> str:
-        img = img.convert("L")
+        frame = _splice_escape_codes(
+            codepoints.astype(np.uint32, copy=False), lit[run_starts], codes
+        )
+        return frame + ColorManager.reset_color()
 
-        pixel_values: GrayscalePixelSequence = list(img.getdata())
+    def _render_grayscale(self, img: Image.Image) -> str:
+        img = self.ensure_mode(img, "L")
 
+        threshold = 0
         if self.transparent:
             threshold = self.calculate_otsu_threshold(img)
             threshold = max(10, int(threshold * 0.2))
 
-            ascii_chars = []
-            for pixel_value in pixel_values:
-                if pixel_value < threshold:
-                    ascii_chars.append(" ")
-                else:
-                    ascii_chars.append(
-                        self.ascii_chars[int(pixel_value / intensity_range)]
-                    )
-            ascii_image = "".join(ascii_chars)
+        pixel_bytes = img.tobytes()
+        if self._byte_lut is not None:
+            # the per-pixel mapping becomes a single translate over the raw bytes
+            byte_table = b" " * threshold + self._byte_lut[threshold:]
+            ascii_image = pixel_bytes.translate(byte_table).decode("ascii")
         else:
-            ascii_image = "".join(
-                [
-                    self.ascii_chars[int(pixel_value / intensity_range)]
-                    for pixel_value in pixel_values
-                ]
-            )
+            # one NumPy gather instead of a dict lookup per character
+            codepoints = self._codepoint_lut
+            if threshold:
+                codepoints = codepoints.copy()
+                codepoints[:threshold] = ord(" ")
+            gathered = codepoints[np.frombuffer(pixel_bytes, dtype=np.uint8)]
+            ascii_image = gathered.tobytes().decode("utf-32-le")
 
         return self.apply_frame_color(ascii_image)
 
 
+# dot pattern -> glyph, an empty cell renders as a plain space
+_BRAILLE_GLYPHS = {
+    pattern: chr(0x2800 + pattern) if pattern else " " for pattern in range(256)
+}
+
+
+def _to_braille_cells(pixels: npt.NDArray[np.uint8]) -> npt.NDArray[np.uint8]:
+    """Split an (H, W, ...) pixel array into (rows, 4, cols, 2, ...) braille cells.
+
+    Pixels that don't fill a whole cell are dropped, images smaller than one
+    cell are zero padded.
+    """
+    height, width = pixels.shape[:2]
+    rows, cols = max(1, height // 4), max(1, width // 2)
+    cropped = pixels[: rows * 4, : cols * 2]
+    if cropped.shape[:2] != (rows * 4, cols * 2):
+        padded = np.zeros((rows * 4, cols * 2, *pixels.shape[2:]), dtype=pixels.dtype)
+        padded[: cropped.shape[0], : cropped.shape[1]] = cropped
+        cropped = padded
+    return cropped.reshape(rows, 4, cols, 2, *pixels.shape[2:])
+
+
+def _braille_kernel(
+    gray: npt.NDArray[np.uint8], pixel_threshold: int
+) -> tuple[npt.NDArray[np.uint8], npt.NDArray[np.bool_]]:
+    """Threshold a grayscale image and pack it into braille dot patterns.
+
+    Args:
+        gray: The (H, W) grayscale pixels
+        pixel_threshold: Pixels brighter than this become dots
+
+    Returns:
+        The (rows, cols) dot patterns and the (rows, 4, cols, 2) dot mask
+    """
+    dots = _to_braille_cells(gray) > pixel_threshold
+    weighted = dots * _BRAILLE_DOT_WEIGHTS[:, None, :]
+    patterns = weighted.sum(axis=(1, 3), dtype=np.uint8)
+    return patterns, dots
+
+
 class BrailleRenderer(BaseRenderer):
     """Renderer that converts images to braille patterns."""
 
@@ -326,65 +620,137 @@ class BrailleRenderer(BaseRenderer):
         (1, 3): 0x80,  # lower-right 4/2
     }
 
+    def __init__(
+        self,
+        style: str,
+        color: bool = False,
+        frame_color: RGBPixel | None = None,
+        transparent: bool = True,
+        high_quality: bool = False,
+        color_palette: str = "truecolor",
+        quantize_bits: int = 0,
+    ):
+        super().__init__(
+            style=style,
+            color=color,
+            frame_color=frame_color,
+            transparent=transparent,
+            high_quality=high_quality,
+            color_palette=color_palette,
+            quantize_bits=quantize_bits,
+        )
+        # the flag is fixed for the renderer's lifetime, pick the factor only once
+        self._threshold_factor = 1.2 if transparent else 0.8
+
+    @override
+    def get_render_size(self, width: int, height: int) -> tuple[int, int]:
+        return (width * 2, height * 4)
+
     @override
     def render(self, img: Image.Image, width: int, height: int) -> str:
-        target_width = width * 2
-        target_height = height * 4
-        img = img.resize((target_width, target_height), Image.Resampling.LANCZOS)
-        gray_img = img.convert("L")
+        if not self.color:
+            # only the luma is used, resizing it touches one channel instead of three
+            img = self.ensure_mode(img, "L")
+        img = self.resize(img, width, height)
+        gray_img = self.ensure_mode(img, "L")
         threshold = self.calculate_otsu_threshold(gray_img)
-        result = self._convert_to_braille(img, gray_img, threshold)
-        return ColorManager.compress_frame(result)
+        # integer pixels compare the same against the floored cutoff, which keeps the
+        # comparison in uint8 instead of promoting the whole frame to float
+        pixel_threshold = min(int(threshold * self._threshold_factor), 255)
+        if self.color:
+            # colors are only emitted when they change, no compress_frame pass needed
+            return self._convert_to_braille_color(img, gray_img, pixel_threshold)
+        return self._convert_to_braille(gray_img, pixel_threshold)
+
+    def _convert_to_braille(self, gray_img: Image.Image, pixel_threshold: int) -> str:
+        patterns, _ = _braille_kernel(
+            np.asarray(gray_img, dtype=np.uint8), pixel_threshold
+        )
+        braille_text = [
+            row.tobytes().decode("latin-1").translate(_BRAILLE_GLYPHS)
+            for row in patterns
+        ]
+        return self.apply_frame_color("\n".join(braille_text))
 
-    def _convert_to_braille(
-        self, color_img: Image.Image, gray_img: Image.Image, threshold: int
+    def _convert_to_braille_color(
+        self, color_img: Image.Image, gray_img: Image.Image, pixel_threshold: int
     ) -> str:
-        width, height = gray_img.size
-        gray_pixels: GrayscalePixelSequence = list(gray_img.getdata())
-        color_pixels: RGBPixelSequence = list(color_img.convert("RGB").getdata())
-        braille_text: list[str] = []
-
-        cols = max(1, width // 2)
-        rows = max(1, height // 4)
-
-        for y in range(rows):
-            row: list[str] = []
-            for x in range(cols):
-                code = self.BRAILLE_PATTERN_BASE
-                active_dots: RGBPixelSequence = []
-
-                for dy in range(4):
-                    for dx in range(2):
-                        px = x * 2 + dx
-                        py = y * 4 + dy
-
-                        if px >= width or py >= height:
-                            continue
-
-                        idx: int = py * width + px
-                        if idx < len(gray_pixels):
-                            pixel_threshold = threshold * 0.8
-                            if self.transparent:
-                                pixel_threshold = threshold * 1.2
-
-                            if gray_pixels[idx] > pixel_threshold:
-                                code |= self.DOT_MAPPING[(dx, dy)]
-                                active_dots.append(color_pixels[idx])
-
-                if active_dots:
-                    if self.color:
-                        avg_color = ColorManager.calculate_average_color(active_dots)
-                        row.append(
-                            f"{ColorManager.rgb_to_ansi(*avg_color)}{chr(code)}{ColorManager.reset_color()}"
-                        )
-                    else:
-                        row.append(chr(code))
-                else:
-                    row.append(" ")
+        patterns, dots = _braille_kernel(
+            np.asarray(gray_img, dtype=np.uint8), pixel_threshold
+        )
+        color_cells = _to_braille_cells(
+            np.asarray(self.ensure_mode(color_img, "RGB"), dtype=np.uint8)
+        )
 
-            braille_text.append("".join(row))
+        # average color of the lit dots for every cell in one reduction
+        sums = (color_cells * dots[..., None]).sum(axis=(1, 3), dtype=np.uint32)
+        counts = np.clip(dots.sum(axis=(1, 3), dtype=np.uint16), 1, None)
+        avg_colors = _pack_rgb(sums // counts[..., None])
 
-        return self.apply_frame_color("\n".join(braille_text))
+        # one extra column holds the line breaks, the last one is dropped
+        rows, cols = patterns.shape
+        glyphs = np.full((rows, cols + 1), ord("\n"), dtype=np.uint32)
+        glyphs[:, :cols] = np.where(
+            patterns, self.BRAILLE_PATTERN_BASE + patterns.astype(np.uint32), ord(" ")
+        )
+
+        # a code is only emitted where a lit cell changes color or starts a new row,
+        # every row that got a color is closed with a reset
+        lit_rows, lit_cols = np.nonzero(patterns)
+        lit_colors = self.quantize_colors(avg_colors[lit_rows, lit_cols])
+        run_starts = np.ones(lit_rows.size, dtype=np.bool_)
+        run_starts[1:] = (lit_colors[1:] != lit_colors[:-1]) | (
+            lit_rows[1:] != lit_rows[:-1]
+        )
+        colored_rows = np.unique(lit_rows)
+        positions = np.concatenate(
+            (
+                lit_rows[run_starts] * (cols + 1) + lit_cols[run_starts],
+                colored_rows * (cols + 1) + cols,
+            )
+        )
+        codes = self.color_codes(lit_colors[run_starts])
+        codes += [ColorManager.reset_color()] * colored_rows.size
+
+        return self.apply_frame_color(
+            _splice_escape_codes(glyphs.ravel()[:-1], positions, codes)
+        )
+
+
+def _braille_dot_weights(
+    dot_mapping: dict[tuple[int, int], int],
+) -> npt.NDArray[np.uint8]:
+    """Lay out an (x, y) -> dot bit mapping as a (4, 2) array indexed [y, x]."""
+    weights = np.zeros((4, 2), dtype=np.uint8)
+    for (x, y), bit in dot_mapping.items():
+        weights[y, x] = bit
+    return weights
+
+
+# braille dot bit for every (dy, dx) position in a 4x2 cell, used by _braille_kernel
+_BRAILLE_DOT_WEIGHTS = _braille_dot_weights(BrailleRenderer.DOT_MAPPING)
+
+
+# renderer options added after the original (style, color, frame_color, transparent)
+# constructor, and their defaults
+_EXTRA_RENDERER_DEFAULTS: dict[str, Any] = {
+    "high_quality": False,
+    "color_palette": "truecolor",
+    "quantize_bits": 0,
+}
+
+
+def _extra_renderer_options(**options: Any) -> dict[str, Any]:
+    """Keep only the extra renderer options that differ from their default.
+
+    Custom renderers registered with the original constructor signature keep
+    working as long as these options are left at their defaults.
+    """
+    return {
+        name: value
+        for name, value in options.items()
+        if value != _EXTRA_RENDERER_DEFAULTS[name]
+    }
 
 
 class RendererFactory:
@@ -467,6 +833,9 @@ class RendererFactory:
         color: bool = False,
         frame_color: RGBPixel | None = None,
         transparent: bool = False,
+        high_quality: bool = False,
+        color_palette: str = "truecolor",
+        quantize_bits: int = 0,
     ) -> BaseRenderer:
         """Create a renderer instance based on the specified style.
 
@@ -475,15 +844,28 @@ class RendererFactory:
             color: Whether to enable color rendering
             frame_color: Optional frame color as RGB tuple
             transparent: Whether to enable transparent background for low brightness pixels
+            high_quality: Whether to always resize frames with LANCZOS
+            color_palette: The color palette used for colored output, truecolor or 256
+            quantize_bits: Low bits dropped from every truecolor channel (0-7)
 
         Raises:
             InvalidRenderStyleError: If the specified style is not registered
+            InvalidColorPaletteError: If the color palette is not supported
+            InvalidQuantizeBitsError: If quantize_bits is outside of 0-7
         """
         if not cls.has_renderer(style):
             raise InvalidRenderStyleError(style)
 
         return cls._renderers[style](
-            style=style, color=color, frame_color=frame_color, transparent=transparent
+            style=style,
+            color=color,
+            frame_color=frame_color,
+            transparent=transparent,
+            **_extra_renderer_options(
+                high_quality=high_quality,
+                color_palette=color_palette,
+                quantize_bits=quantize_bits,
+            ),
         )
 
 
@@ -492,6 +874,33 @@ RendererFactory.register_renderer(tuple(TextRenderer.styles.keys()), TextRendere
 RendererFactory.register_renderer("braille", BrailleRenderer)
 
 
+# set by _init_render_worker in every pre-render worker process
+_worker_renderer: BaseRenderer | None = None
+
+
+def _init_render_worker(
+    renderer_class: type[BaseRenderer], renderer_options: dict[str, Any]
+) -> None:
+    """Build the renderer once per worker process, LUTs and all."""
+    global _worker_renderer
+    _worker_renderer = renderer_class(**renderer_options)
+
+
+def _render_chunk(frames: npt.NDArray[np.uint8], width: int, height: int) -> list[str]:
+    """Render a chunk of already decoded and resized frames in a worker process."""
+    if _worker_renderer is None:
+        raise ThreadingError("render worker was not initialized")
+    return [
+        _worker_renderer.render(Image.fromarray(frame), width, height)
+        for frame in frames
+    ]
+
+
+def _frame_label(index: int) -> str:
+    """Name a streamed frame, which has no path, for error messages."""
+    return f"frame {index + 1}"
+
+
 class RendererManager:
     """Manager class for handling rendering operations.
 
@@ -505,9 +914,18 @@ class RendererManager:
         color: bool = False,
         frame_color: RGBPixel | None = None,
         transparent: bool = True,
+        high_quality: bool = False,
+        color_palette: str = "truecolor",
+        quantize_bits: int = 0,
     ) -> None:
         self.renderer = RendererFactory.create_renderer(
-            style=style, color=color, frame_color=frame_color, transparent=transparent
+            style=style,
+            color=color,
+            frame_color=frame_color,
+            transparent=transparent,
+            high_quality=high_quality,
+            color_palette=color_palette,
+            quantize_bits=quantize_bits,
         )
 
     def hide_cursor(self) -> None:
@@ -520,43 +938,320 @@ class RendererManager:
         sys.stdout.write("\033[?25h")
         sys.stdout.flush()
 
-    def convert_frame(self, image_path: str, width: int, height: int) -> str:
+    def convert_frame(
+        self, frame: str | npt.NDArray[np.uint8], width: int, height: int
+    ) -> str:
+        """Render a single frame.
+
+        Args:
+            frame: Path of the frame image, or the decoded (H, W, 3) RGB frame
+            width: The target width in characters
+            height: The target height in characters
+
+        Returns:
+            The rendered frame
+        """
         try:
-            with Image.open(image_path) as img:
-                return self.renderer.render(img, width, height)
+            if isinstance(frame, str):
+                with Image.open(frame) as img:
+                    return self.renderer.render(img, width, height)
+            return self.renderer.render(Image.fromarray(frame), width, height)
         except Exception as e:
-            raise FrameRenderingError(image_path, str(e))
+            name = frame if isinstance(frame, str) else "decoded frame"
+            raise FrameRenderingError(name, str(e))
 
     def pre_render_frames(
-        self, frame_paths: list[str], width: int, height: int, num_threads: int = 1
+        self,
+        frame_paths: list[str],
+        width: int,
+        height: int,
+        num_threads: int = 1,
+        cache_size: int = 512,
+        batch_size: int = 256,
     ) -> dict[str, str]:
+        """Render all frame files ahead of time.
+
+        The files of a batch are opened and resized in parallel chunks, see
+        _pre_render for the rest of the pipeline.
+
+        Args:
+            frame_paths: Paths of the frames to render
+            width: The target width in characters
+            height: The target height in characters
+            num_threads: Number of worker threads and processes to use
+            cache_size: Maximum number of unique rendered frames kept in the cache
+            batch_size: Number of frames decoded and held in memory at once
+
+        Returns:
+            A mapping of frame path to its rendered string
+        """
         if not frame_paths:
             return {}
 
         num_threads = max(1, min(num_threads, len(frame_paths)))
-        pre_rendered_frames: dict[str, str] = {}
-
-        def render_frame(frame_path: str) -> tuple[str, str]:
-            try:
-                with Image.open(frame_path) as img:
-                    return frame_path, self.renderer.render(img, width, height)
-            except Exception as e:
-                raise FrameRenderingError(frame_path, str(e))
-
-        with ThreadPoolExecutor(max_workers=num_threads) as executor:
-            futures = [executor.submit(render_frame, path) for path in frame_paths]
-
-            for future in tqdm(
-                as_completed(futures),
-                total=len(futures),
-                desc=f"Pre-rendering frames ({num_threads} threads)",
-                unit="frame",
-            ):
+
+        def load_frames(
+            paths: list[str],
+        ) -> list[npt.NDArray[np.uint8] | FrameRenderingError]:
+            frames: list[npt.NDArray[np.uint8] | FrameRenderingError] = []
+            for frame_path in paths:
                 try:
-                    path, rendered = future.result()
-                    if rendered:
-                        pre_rendered_frames[path] = rendered
+                    with Image.open(frame_path) as img:
+                        frames.append(self._prepare_frame(img, width, height))
                 except Exception as e:
-                    print(f"Exception during frame rendering: {str(e)}")
+                    frames.append(FrameRenderingError(frame_path, str(e)))
+            return frames
+
+        def load_batch(
+            executor: ThreadPoolExecutor, start: int, count: int
+        ) -> Iterator[npt.NDArray[np.uint8] | FrameRenderingError]:
+            # every task loads a slice of paths to keep the per-task overhead low
+            paths = frame_paths[start : start + count]
+            chunk_size = max(1, len(paths) // (num_threads * 4))
+            path_chunks = [
+                paths[i : i + chunk_size] for i in range(0, len(paths), chunk_size)
+            ]
+            return chain.from_iterable(executor.map(load_frames, path_chunks))
+
+        rendered_frames = self._pre_render(
+            load_batch,
+            frame_paths.__getitem__,
+            width,
+            height,
+            num_threads,
+            len(frame_paths),
+            cache_size,
+            batch_size,
+        )
+        return {
+            path: rendered
+            for path, rendered in zip(frame_paths, rendered_frames)
+            if rendered
+        }
 
-        return pre_rendered_frames
+    def pre_render_stream(
+        self,
+        frames: Iterable[npt.NDArray[np.uint8]],
+        width: int,
+        height: int,
+        num_threads: int = 1,
+        cache_size: int = 512,
+        batch_size: int = 256,
+        total: int | None = None,
+    ) -> list[str]:
+        """Render already decoded frames ahead of time, in the order they arrive.
+
+        Meant for frames piped straight from a decoder, no files are involved. The
+        frames are pulled from the iterable in order by one task per batch, so a
+        blocking source is read while the previous batch renders.
+
+        Args:
+            frames: The decoded (H, W, 3) RGB frames
+            width: The target width in characters
+            height: The target height in characters
+            num_threads: Number of worker threads and processes to use
+            cache_size: Maximum number of unique rendered frames kept in the cache
+            batch_size: Number of frames decoded and held in memory at once
+            total: The expected number of frames, only used for the progress bar
+
+        Returns:
+            The rendered frames in order, frames that failed to render are empty
+        """
+        frame_iterator = iter(frames)
+
+        def read_frames(
+            start: int, count: int
+        ) -> list[npt.NDArray[np.uint8] | FrameRenderingError]:
+            loaded: list[npt.NDArray[np.uint8] | FrameRenderingError] = []
+            for index, frame in enumerate(islice(frame_iterator, count), start):
+                try:
+                    img = Image.fromarray(frame)
+                    loaded.append(self._prepare_frame(img, width, height))
+                except Exception as e:
+                    loaded.append(FrameRenderingError(_frame_label(index), str(e)))
+            return loaded
+
+        def load_batch(
+            executor: ThreadPoolExecutor, start: int, count: int
+        ) -> Iterator[npt.NDArray[np.uint8] | FrameRenderingError]:
+            # a stream can only be read in order, so the whole batch is one task
+            return chain.from_iterable(executor.map(read_frames, [start], [count]))
+
+        return self._pre_render(
+            load_batch,
+            _frame_label,
+            width,
+            height,
+            max(1, num_threads),
+            total,
+            cache_size,
+            batch_size,
+        )
+
+    def _prepare_frame(
+        self, img: Image.Image, width: int, height: int
+    ) -> npt.NDArray[np.uint8]:
+        """Resize a frame to its render size and get its RGB pixels."""
+        resized = self.renderer.resize(img, width, height)
+        return np.asarray(self.renderer.ensure_mode(resized, "RGB"))
+
+    def _pre_render(
+        self,
+        load_batch: Callable[
+            [ThreadPoolExecutor, int, int],
+            Iterator[npt.NDArray[np.uint8] | FrameRenderingError],
+        ],
+        frame_name: Callable[[int], str],
+        width: int,
+        height: int,
+        num_threads: int,
+        total: int | None,
+        cache_size: int,
+        batch_size: int,
+    ) -> list[str]:
+        """Run the batched pre-render pipeline.
+
+        Frames are processed in batches of two phases. First load_batch decodes and
+        resizes the frames in a thread pool and they are copied into a single reused
+        (N, H, W, 3) array, then the unique frames of that batch are split into
+        one chunk per worker and rendered in a process pool. While a batch renders,
+        the next one is already being decoded. A batch shorter than batch_size ends
+        the pipeline.
+
+        Frames with identical pixel data (static scenes, held animation frames)
+        are only rendered once, the result is shared through a bounded LRU cache
+        keyed on a hash of the resized frame.
+
+        Args:
+            load_batch: Starts loading count frames from the given frame index in
+                the executor and returns their results in order
+            frame_name: Gives the name of a frame index for error messages
+            width: The target width in characters
+            height: The target height in characters
+            num_threads: Number of worker threads and processes to use
+            total: The expected number of frames, only used for the progress bar
+            cache_size: Maximum number of unique rendered frames kept in the cache
+            batch_size: Number of frames decoded and held in memory at once
+
+        Returns:
+            The rendered frames in order, frames that failed to render are empty
+        """
+        rendered_frames: list[str] = []
+        render_cache: OrderedDict[bytes, str] = OrderedDict()
+        renderer_class = type(self.renderer)
+        renderer_options: dict[str, Any] = {
+            "style": self.renderer.style,
+            "color": self.renderer.color,
+            "frame_color": self.renderer.frame_color,
+            "transparent": self.renderer.transparent,
+            **_extra_renderer_options(
+                high_quality=self.renderer.high_quality,
+                color_palette=self.renderer.color_palette,
+                quantize_bits=self.renderer.quantize_bits,
+            ),
+        }
+
+        # every frame is resized to the same size, so one buffer is reused for all
+        # batches instead of stacking a new array each time. total may be off for a
+        # stream, so it doesn't size the buffer, unused pages are never touched
+        render_width, render_height = self.renderer.get_render_size(width, height)
+        batch_frames = np.empty(
+            (batch_size, render_height, render_width, 3), dtype=np.uint8
+        )
+
+        with (
+            ThreadPoolExecutor(max_workers=num_threads) as io_executor,
+            ProcessPoolExecutor(
+                max_workers=num_threads,
+                initializer=_init_render_worker,
+                initargs=(renderer_class, renderer_options),
+            ) as render_executor,
+            tqdm(
+                total=total,
+                desc=f"Pre-rendering frames ({num_threads} workers)",
+                unit="frame",
+            ) as progress,
+        ):
+            start = 0
+            next_results: Iterator[npt.NDArray[np.uint8] | FrameRenderingError]
+            next_results = load_batch(io_executor, start, batch_size)
+            while True:
+                # phase 1: decode + resize, PIL releases the GIL for most of this
+                loaded_indices: list[int] = []
+                for index, result in enumerate(next_results, start):
+                    rendered_frames.append("")
+                    if isinstance(result, FrameRenderingError):
+                        print(f"Exception during frame rendering: {str(result)}")
+                        progress.update()
+                        continue
+                    batch_frames[len(loaded_indices)] = result
+                    loaded_indices.append(index)
+
+                batch_end = len(rendered_frames)
+                if batch_end == start:
+                    break
+
+                # the next batch decodes in the thread pool while this one renders
+                if batch_end - start == batch_size:
+                    next_results = load_batch(io_executor, batch_end, batch_size)
+                else:
+                    next_results = iter(())
+                start = batch_end
+
+                if not loaded_indices:
+                    continue
+                frames = batch_frames[: len(loaded_indices)]
+
+                # phase 2: render every frame not seen before, one chunk per worker
+                pending: dict[bytes, list[int]] = {}
+                unique_indices: list[int] = []
+                for position, (index, frame) in enumerate(zip(loaded_indices, frames)):
+                    digest = hashlib.blake2b(frame.tobytes(), digest_size=16).digest()
+                    cached = render_cache.get(digest)
+                    if cached is not None:
+                        render_cache.move_to_end(digest)
+                        rendered_frames[index] = cached
+                        progress.update()
+                    elif digest in pending:
+                        pending[digest].append(index)
+                    else:
+                        pending[digest] = [index]
+                        unique_indices.append(position)
+
+                if not unique_indices:
+                    continue
+
+                digests = list(pending)  # same order as unique_indices
+                chunks = np.array_split(
+                    frames[unique_indices], min(num_threads, len(unique_indices))
+                )
+                chunk_futures: dict[Future[list[str]], tuple[int, int]] = {}
+                offset = 0
+                for chunk in chunks:
+                    future = render_executor.submit(_render_chunk, chunk, width, height)
+                    chunk_futures[future] = (offset, len(chunk))
+                    offset += len(chunk)
+
+                for future in as_completed(chunk_futures):
+                    offset, count = chunk_futures[future]
+                    chunk_digests = digests[offset : offset + count]
+                    try:
+                        rendered_chunk = future.result()
+                    except Exception as e:
+                        for digest in chunk_digests:
+                            indices = pending[digest]
+                            error = FrameRenderingError(frame_name(indices[0]), str(e))
+                            print(f"Exception during frame rendering: {str(error)}")
+                            progress.update(len(indices))
+                        continue
+
+                    for digest, rendered in zip(chunk_digests, rendered_chunk):
+                        indices = pending[digest]
+                        render_cache[digest] = rendered
+                        if len(render_cache) > cache_size:
+                            render_cache.popitem(last=False)
+                        for index in indices:
+                            rendered_frames[index] = rendered
+                        progress.update(len(indices))
+
+        return rendered_frames
@@ -2,9 +2,18 @@ import os
 import tempfile
 import shutil
 import ffmpeg
-import re
+import queue
 import subprocess
+import sys
+import threading
+import weakref
+from collections.abc import Generator, Iterator
+from functools import lru_cache
+from io import BufferedReader
 from shutil import which
+from typing import IO, Any
+import numpy as np
+import numpy.typing as npt
 from ffmpeg import exceptions as ffmpeg_e
 from .exceptions import (
     VideoNotFoundError,
@@ -14,6 +23,7 @@ from .exceptions import (
 )
 
 
+@lru_cache(maxsize=1)  # ffmpeg doesn't come or go while we're running
 def check_ffmpeg_available() -> bool:  # TODO: make this return the version as well
     """Check if FFmpeg is available on the system"""
     # try using shutil.which first (checks if it's in PATH)
@@ -33,68 +43,176 @@ def check_ffmpeg_available() -> bool:  # TODO: make this return the version as w
         return False
 
 
-class VideoProcessor:
-    def __init__(self, video_path: str) -> None:
-        self.video_path = (
-            os.path.isabs(video_path) and video_path or os.path.abspath(video_path)
+# bytes of ffmpeg's log kept for error messages, the useful part is at the end
+_STDERR_TAIL = 4096
+
+
+def _read_stderr_tail(stderr: IO[bytes], returncode: int) -> str:
+    """Get the end of the ffmpeg log written to a stderr file"""
+    stderr.seek(0, os.SEEK_END)
+    stderr.seek(max(0, stderr.tell() - _STDERR_TAIL))
+    error_msg = stderr.read().decode(errors="replace").strip()
+    return error_msg or f"FFmpeg exited with code {returncode}"
+
+
+def _run_ffmpeg(output_stream: Any) -> str | None:
+    """Run an ffmpeg command to completion
+
+    stdout is discarded and stderr goes to a temp file, so the log is never held
+    in memory while ffmpeg runs.
+
+    Returns:
+        The end of the ffmpeg log if it failed, None otherwise
+    """
+    with tempfile.TemporaryFile() as stderr:
+        result = subprocess.run(
+            output_stream.compile(overwrite_output=True),
+            stdout=subprocess.DEVNULL,
+            stderr=stderr,
+            check=False,
         )
+        if result.returncode != 0:
+            return _read_stderr_tail(stderr, result.returncode)
+    return None
+
+
+def _grow_pipe(fd: int, size: int) -> None:
+    """Try to raise the kernel buffer of a pipe to size bytes (Linux only)
+
+    The default 64KB holds less than one frame, so ffmpeg stalls on every frame
+    until it is read. Unprivileged processes can go up to pipe-max-size (1MB by
+    default), the buffer is left as is if that's not allowed.
+    """
+    if sys.platform != "linux":
+        return
+
+    import fcntl
+
+    try:
+        fcntl.fcntl(fd, fcntl.F_SETPIPE_SZ, min(size, 1 << 20))
+    except OSError:
+        pass
+
+
+def prefetch_frames[T](frames: Iterator[T], buffer_size: int) -> Generator[T]:
+    """Read frames ahead in a background thread
+
+    Keeps up to buffer_size frames ready, so the source (e.g. the FFmpeg pipe of
+    iter_frames) keeps decoding while the consumer renders. Closing the returned
+    generator stops the thread and closes frames if it is a generator.
+
+    Args:
+        frames: The frames to read ahead
+        buffer_size: Maximum number of frames held in the buffer
+
+    Yields:
+        The frames of the source, in order
+    """
+    # frames are wrapped in a tuple, None marks the end and exceptions are re-raised
+    buffer: queue.Queue[tuple[T] | Exception | None] = queue.Queue(buffer_size)
+    stop = threading.Event()
+
+    def put(entry: tuple[T] | Exception | None) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce() -> None:
+        try:
+            for frame in frames:
+                if not put((frame,)):
+                    break
+            else:
+                put(None)
+        except Exception as e:
+            put(e)
+        finally:
+            # generators can only be closed from the thread running them
+            if isinstance(frames, Generator):
+                frames.close()
+
+    thread = threading.Thread(target=produce, name="frame-prefetch", daemon=True)
+    thread.start()
+    try:
+        while (entry := buffer.get()) is not None:
+            if isinstance(entry, Exception):
+                raise entry
+            yield entry[0]
+    finally:
+        stop.set()
+        thread.join()
+
+
+class VideoProcessor:
+    def __init__(self, video_path: str, hwaccel: bool = True) -> None:
+        self.video_path = os.path.abspath(video_path)
         if not os.path.exists(self.video_path):
             raise VideoNotFoundError(self.video_path)
         self.temp_dir = tempfile.mkdtemp(prefix="pyplayer_")
-        self.frames_dir = os.path.join(self.temp_dir, "frames")
+        # removes the temp dir if cleanup is never reached, e.g. when the player
+        # fails before playback starts, at the latest on interpreter exit
+        self._finalizer = weakref.finalize(self, shutil.rmtree, self.temp_dir, True)
         self.audio_path = os.path.join(self.temp_dir, "audio.wav")
+        self.hwaccel = hwaccel
         self._cleanup_done = False
-        os.makedirs(self.frames_dir, exist_ok=True)
+        self._video_stream: dict[str, Any] | None = None
 
-    def process_video(
-        self,
-        grayscale: bool = False,
-        color_smoothing: bool = False,
-        color_smoothing_params: dict[str, float] | None = None,
-        output_resolution: tuple[int, int] | None = (640, 480),
-    ) -> tuple[str, str, float | None]:
-        """Process video file by extracting frames and audio"""
+    def process_video(self, extract_audio: bool = True) -> tuple[str, float | None]:
+        """Prepare the video for playback by probing it and extracting the audio
+
+        The frames are streamed with iter_frames, none are written to disk. Pass
+        extract_audio=False when iter_frames writes the audio as well.
+
+        Returns:
+            The path of the extracted audio and the video's frame rate, if known
+        """
         if not check_ffmpeg_available():
             raise FFmpegNotFoundError()
 
-        try:
-            print(f"Processing video: {self.video_path} (This might take a bit...)")
-            fps = self._get_video_fps()
+        print(f"Processing video: {self.video_path} (This might take a bit...)")
+        fps = self._get_video_fps()
+        if extract_audio:
             self._extract_audio()
-            self._extract_frames(
-                grayscale, color_smoothing, color_smoothing_params, output_resolution
-            )
-            return self.frames_dir, self.audio_path, fps
-        except ffmpeg_e.FFMpegError as e:
-            stderr = getattr(e, "stderr", None)
-            error_msg = stderr.decode() if stderr else str(e)
-            raise FrameExtractionError(error_msg)
+        return self.audio_path, fps
 
     def _extract_audio(self) -> None:
         """Extract audio from video file"""
         try:
             input_stream = ffmpeg.input(filename=self.video_path)
-            output_stream = input_stream.output(
-                filename=self.audio_path, q="0", map="a"
-            )
-            output_stream.run(
-                capture_stdout=True, capture_stderr=True, overwrite_output=True
-            )
+            error_msg = _run_ffmpeg(self._audio_output(input_stream))
         except ffmpeg_e.FFMpegError as e:
-            stderr = getattr(e, "stderr", None)
-            error_msg = stderr.decode() if stderr else str(e)
+            error_msg = str(e)
+        if error_msg is not None:
             raise AudioExtractionError(error_msg)
 
-    def _extract_frames(
+    def _video_input(self) -> Any:
+        """Open the video for decoding, on the GPU if hwaccel is set"""
+        if self.hwaccel:
+            # picks whatever decoder the system has and falls back to software,
+            # the decoded frames are copied back for the CPU filters
+            return ffmpeg.input(filename=self.video_path, hwaccel="auto")
+        return ffmpeg.input(filename=self.video_path)
+
+    def _audio_output(self, input_stream: Any) -> Any:
+        """Build the output writing the audio of input_stream to audio_path"""
+        return ffmpeg.output(input_stream.audio, filename=self.audio_path, q="0")
+
+    def _build_video_stream(
         self,
+        input_stream: Any,
         grayscale: bool = False,
         color_smoothing: bool = False,
         color_smoothing_params: dict[str, float] | None = None,
         output_resolution: tuple[int, int] | None = (640, 480),
-    ) -> None:
-        """Extract and process frames from video file
+    ) -> Any:
+        """Build the filtered video stream
 
         Args:
+            input_stream: The input the video is decoded from
             grayscale: Apply grayscale filter if True
             color_smoothing: Apply denoise filter if True
             color_smoothing_params: Parameters for the hqdn3d denoising filter
@@ -105,15 +223,28 @@ class VideoProcessor:
                 - chroma_tmp: Temporal chroma strength (default: 4.5)
             output_resolution: Target resolution as (width, height) tuple
         """
-        stream = ffmpeg.input(filename=self.video_path)
+        stream = input_stream
+
+        # downscaling first means the filters below only see the output pixels,
+        # an upscale stays last so they don't run on the bigger frame
+        scale_first = False
+        if output_resolution is not None:
+            source_size = self._get_video_size()
+            scale_first = source_size is None or (
+                output_resolution[0] * output_resolution[1]
+                <= source_size[0] * source_size[1]
+            )
+            if scale_first:
+                stream = stream.scale(w=output_resolution[0], h=output_resolution[1])
 
         # Apply grayscale filter if requested
         if grayscale:
-            # Apply the complex lutrgb filter
-            lut_expr = "if(gte(val,0), if(gte(val,224), 255, if(gte(val,128), 192, if(gte(val,64), 128, 0))))"
-            stream = stream.lutrgb(r=lut_expr, g=lut_expr, b=lut_expr)
-            # Apply hue filter to remove saturation
-            stream = stream.hue(s=0)
+            # drop the chroma first, the posterize lut then only maps the luma plane
+            stream = stream.format(pix_fmts="gray")
+            lut_expr = (
+                "if(gte(val,224), 255, if(gte(val,128), 192, if(gte(val,64), 128, 0)))"
+            )
+            stream = stream.lutyuv(y=lut_expr)
 
         if color_smoothing:
             defaults = {
@@ -134,27 +265,106 @@ class VideoProcessor:
                 chroma_tmp=params.get("chroma_tmp", 4.5),
             )
 
-        if output_resolution is not None:
+        if output_resolution is not None and not scale_first:
             stream = stream.scale(w=output_resolution[0], h=output_resolution[1])
 
-        output_path = os.path.join(self.frames_dir, "frame_%05d.png")
-        try:
-            output_stream = ffmpeg.output(stream, filename=output_path)
-            output_stream.run(
-                capture_stdout=True, capture_stderr=True, overwrite_output=True
+        return stream
+
+    def iter_frames(
+        self,
+        grayscale: bool = False,
+        color_smoothing: bool = False,
+        color_smoothing_params: dict[str, float] | None = None,
+        output_resolution: tuple[int, int] | None = (640, 480),
+        extract_audio: bool = False,
+        reuse_buffer: bool = False,
+    ) -> Generator[npt.NDArray[np.uint8]]:
+        """Decode the video frames straight from an FFmpeg pipe
+
+        The frames are sent over stdout as raw RGB, so no image files are written
+        or decoded again. The filter arguments are the same as for
+        _build_video_stream, with extract_audio the audio file is written in the
+        same run and complete once all frames were read.
+
+        With reuse_buffer every frame is read into the same array, which saves an
+        allocation per frame but means a frame is only valid until the next one is
+        read. Only use it when each frame is copied or consumed right away.
+
+        Yields:
+            Each frame as a (height, width, 3) RGB array
+
+        Raises:
+            FFmpegNotFoundError: If FFmpeg is not available
+            FrameExtractionError: If FFmpeg fails to decode the video
+        """
+        if not check_ffmpeg_available():
+            raise FFmpegNotFoundError()
+
+        # raw frames carry no size, so always scale to one we know
+        if output_resolution is None:
+            output_resolution = self._get_video_size()
+            if output_resolution is None:
+                raise FrameExtractionError("Could not determine the video size")
+        width, height = output_resolution
+        frame_size = width * height * 3
+
+        input_stream = self._video_input()
+        stream = self._build_video_stream(
+            input_stream,
+            grayscale,
+            color_smoothing,
+            color_smoothing_params,
+            output_resolution,
+        )
+        output_stream = ffmpeg.output(
+            stream, filename="pipe:", f="rawvideo", pix_fmt="rgb24"
+        )
+        if extract_audio:
+            output_stream = ffmpeg.merge_outputs(
+                output_stream, self._audio_output(input_stream)
             )
-        except ffmpeg_e.FFMpegError as e:
-            stderr = getattr(e, "stderr", None)
-            error_msg = stderr.decode() if stderr else str(e)
-            raise FrameExtractionError(error_msg)
 
-    def _get_video_fps(self) -> float | None:
-        """Get video frame rate using FFprobe"""
-        try:
+        with tempfile.TemporaryFile() as stderr:
+            # stderr goes to a file, a full stderr pipe would block ffmpeg
+            process = subprocess.Popen(
+                output_stream.compile(overwrite_output=True),
+                stdout=subprocess.PIPE,
+                stderr=stderr,
+            )
+            # a buffered pipe, its readinto only returns short at the end of the stream
+            stdout = process.stdout
+            if not isinstance(stdout, BufferedReader):
+                process.kill()
+                process.wait()
+                raise FrameExtractionError("Could not open the FFmpeg pipe")
+            _grow_pipe(stdout.fileno(), frame_size * 4)
+
+            try:
+                frame = np.empty((height, width, 3), dtype=np.uint8)
+                # a short read means ffmpeg is done, a partial frame is dropped
+                while stdout.readinto(memoryview(frame).cast("B")) == frame_size:
+                    yield frame
+                    if not reuse_buffer:
+                        frame = np.empty((height, width, 3), dtype=np.uint8)
+            finally:
+                # stopped early, ffmpeg has nothing left to do
+                if process.poll() is None:
+                    process.kill()
+                stdout.close()
+                process.wait()
+
+            if process.returncode != 0:
+                raise FrameExtractionError(
+                    _read_stderr_tail(stderr, process.returncode)
+                )
+
+    def _probe_video_stream(self) -> dict[str, Any] | None:
+        """Get the FFprobe info of the first video stream, probed only once"""
+        if self._video_stream is None:
             probe = ffmpeg.probe(
                 filename=self.video_path, cmd="ffprobe", timeout=5, loglevel="quiet"
             )
-            video_stream = next(
+            self._video_stream = next(
                 (
                     stream
                     for stream in probe["streams"]
@@ -162,18 +372,47 @@ class VideoProcessor:
                 ),
                 None,
             )
+        return self._video_stream
+
+    def _get_video_size(self) -> tuple[int, int] | None:
+        """Get the displayed video size, rotation included, using FFprobe"""
+        try:
+            video_stream = self._probe_video_stream()
+            if video_stream is None:
+                return None
+
+            width, height = int(video_stream["width"]), int(video_stream["height"])
+            # ffmpeg autorotates, so a sideways video comes out with swapped sides
+            rotation = video_stream.get("tags", {}).get("rotate", 0)
+            for side_data in video_stream.get("side_data_list", []):
+                rotation = side_data.get("rotation", rotation)
+            if abs(int(float(rotation))) % 180 == 90:
+                width, height = height, width
+            return width, height
+        except (ffmpeg_e.FFMpegError, KeyError, ValueError):
+            return None
+
+    def _get_video_fps(self) -> float | None:
+        """Get video frame rate using FFprobe"""
+        try:
+            video_stream = self._probe_video_stream()
             if video_stream is None:
                 return None
 
             # Extract frame rate which might be in the format '24/1'
             frame_rate = video_stream.get("r_frame_rate")
             if frame_rate:
-                match = re.match(r"(\d+)/(\d+)", frame_rate)
-                if match:
-                    num, den = map(int, match.groups())
-                    return num / den
+                num, sep, den = frame_rate.partition("/")
+                if sep:
+                    return int(num) / int(den)
             return None
-        except (ffmpeg_e.FFMpegError, KeyError, StopIteration, ValueError):
+        except (
+            ffmpeg_e.FFMpegError,
+            KeyError,
+            StopIteration,
+            ValueError,
+            ZeroDivisionError,
+        ):
             return None
 
     def cleanup(self) -> None:
@@ -186,6 +425,7 @@ class VideoProcessor:
         ):  # just in case its in a weird quasi-initialized state
             try:
                 shutil.rmtree(self.temp_dir)
+                self._finalizer.detach()
                 self._cleanup_done = True
             except (OSError, IOError) as e:
                 print(f"Warning: Failed to cleanup temporary files: {e}")
@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+
+from pyplayer.exceptions import InvalidQuantizeBitsError
+from pyplayer.renderer_factory import RendererFactory, RendererManager
+
+
+def test_pre_render_stream_longer_than_total() -> None:
+    # the frame count of a stream is only an estimate, more frames may arrive
+    frames = (np.full((8, 8, 3), index, dtype=np.uint8) for index in range(50))
+    manager = RendererManager(style="legacy")
+
+    rendered = manager.pre_render_stream(frames, 4, 4, batch_size=16, total=10)
+
+    assert len(rendered) == 50
+    assert all(rendered)
+
+
+@pytest.mark.parametrize("quantize_bits", [-1, 8])
+def test_invalid_quantize_bits(quantize_bits: int) -> None:
+    with pytest.raises(InvalidQuantizeBitsError):
+        RendererFactory.create_renderer("default", quantize_bits=quantize_bits)